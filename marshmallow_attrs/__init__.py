@@ -37,7 +37,9 @@ Full example::
 import collections.abc
 import datetime
 import decimal
-import inspect
+import functools
+import threading
+import types
 import uuid
 from enum import Enum
 from enum import EnumMeta
@@ -51,16 +53,35 @@ from typing import NewType
 from typing import Optional
 from typing import Tuple
 from typing import Type
+from typing import Union
 from typing import cast
 
+try:
+    from typing import ForwardRef
+except ImportError:  # python 3.6
+    from typing import _ForwardRef as ForwardRef  # type: ignore
+
 import attr
 import marshmallow
 import typing_inspect
 
+try:
+    from typing import get_args as _get_args
+    from typing import get_origin as _get_origin
+except ImportError:  # python < 3.8
+    from typing_inspect import get_origin as _get_origin
+
+    _get_args = functools.partial(typing_inspect.get_args, evaluate=True)
+
 
 __all__ = ["dataclass", "add_schema", "class_schema", "field_for_schema"]
 
 NoneType = type(None)
+# Type of the objects returned by typing.NewType (a class since python 3.10)
+_NewTypeType = NewType if isinstance(NewType, type) else types.FunctionType
+
+# marshmallow_enum.EnumField, imported on first use
+_enum_field: Optional[Type[marshmallow.fields.Field]] = None
 
 
 # _cls should never be specified by keyword, so start it with an
@@ -139,9 +160,19 @@ def add_schema(clazz: type) -> type:
     return clazz
 
 
+# Schemas generated by class_schema. A schema is registered before its fields
+# are built, so that recursive references to its class reuse it.
+_SCHEMA_REGISTRY: Dict[type, Type[marshmallow.Schema]] = {}
+# Held while building schemas, so that other threads never see partial ones
+_SCHEMA_LOCK = threading.RLock()
+# Classes registered by the outermost class_schema call in progress
+_pending_schemas: Optional[List[type]] = None
+
+
 def class_schema(clazz: type) -> Type[marshmallow.Schema]:
     """
-    Convert a class to a marshmallow schema
+    Convert a class to a marshmallow schema.
+    The result is cached, so each class is only converted once.
 
     :param clazz: A python class (may be a dataclass)
     :return: A marshmallow Schema corresponding to the dataclass
@@ -197,6 +228,17 @@ def class_schema(clazz: type) -> Type[marshmallow.Schema]:
     >>> person
     Person(name='Anonymous', friends=[Person(name='Roger Boucher', friends=[])])
 
+    >>> class_schema(Person) is class_schema(Person)
+    True
+
+    >>> @attr.dataclass()
+    ... class Node:
+    ...   children: List['Node'] = attr.ib(factory=list)
+    ...
+    >>> _ = attr.resolve_types(Node, localns={'Node': Node}) # Recursive field, without forward reference
+    >>> class_schema(Node)().load({"children": [{"children": []}]})
+    Node(children=[Node(children=[])])
+
     # >>> @attr.dataclass()
     # ... class C:
     # ...   important: int = attr.ib(init=True, default=0)
@@ -236,11 +278,55 @@ def class_schema(clazz: type) -> Type[marshmallow.Schema]:
     Traceback (most recent call last):
       ...
     TypeError: None is not a dataclass and cannot be turned into one.
+
+    >>> @attr.dataclass()
+    ... class Leaf:
+    ...   tree: 'Tree'
+    ...
+    >>> @attr.dataclass()
+    ... class Tree:
+    ...   leaf: Leaf
+    ...   broken: None # unsupported type
+    ...
+    >>> _ = attr.resolve_types(Leaf, localns={'Tree': Tree})
+    >>> class_schema(Tree)
+    Traceback (most recent call last):
+      ...
+    TypeError: None is not a dataclass and cannot be turned into one.
+
+    >>> class_schema(Leaf) # The Leaf schema built with the failed Tree schema was discarded too
+    Traceback (most recent call last):
+      ...
+    TypeError: None is not a dataclass and cannot be turned into one.
     """
+    global _pending_schemas
+    with _SCHEMA_LOCK:
+        schema_class = _SCHEMA_REGISTRY.get(clazz)
+        if schema_class is not None:
+            return schema_class
+        if _pending_schemas is not None:  # Called while building another schema
+            return _build_schema(clazz)
+
+        _pending_schemas = []
+        try:
+            return _build_schema(clazz)
+        except BaseException:
+            # Schemas completed during this call may refer to the failed ones
+            for pending in _pending_schemas:
+                del _SCHEMA_REGISTRY[pending]
+            raise
+        finally:
+            _pending_schemas = None
 
+
+def _build_schema(clazz: type) -> Type[marshmallow.Schema]:
+    """
+    Implementation of :func:`class_schema`, called with `_SCHEMA_LOCK` held.
+    The schema is registered before its fields are built.
+    """
     try:
         # noinspection PyDataclass
-        fields: Tuple[attr.ib] = attr.fields(clazz)
+        fields: Tuple[attr.Attribute, ...] = attr.fields(clazz)
     except TypeError:  # Not a dataclass
         try:
             return class_schema(attr.dataclass(clazz))
@@ -249,22 +335,58 @@ def class_schema(clazz: type) -> Type[marshmallow.Schema]:
                 f"{getattr(clazz, '__name__', repr(clazz))} is not a dataclass and cannot be turned into one."
             )
 
-    # Copy all public members of the dataclass to the schema
-    attributes = {k: v for k, v in inspect.getmembers(clazz) if not k.startswith("_")}
-    # Update the schema members to contain marshmallow fields instead of dataclass fields
-    attributes.update(
-        (
-            field.name,
-            field_for_schema(field.type, _get_field_default(field), field.metadata),
-        )
-        for field in fields
-        if field.init
-    )
-
-    schema_class = type(clazz.__name__, (_base_schema(clazz),), attributes)
+    # Copy all public members of the dataclass to the schema,
+    # except the ones that will be replaced by marshmallow fields
+    attributes = _public_members(clazz)
+    for field in fields:
+        if field.init:
+            attributes.pop(field.name, None)
+
+    @marshmallow.post_load
+    def make_data_class(self, data, **kwargs):
+        return clazz(**data)
+
+    attributes["make_data_class"] = make_data_class
+
+    schema_class = type(clazz.__name__, (_AttrsBaseSchema,), attributes)
+    _SCHEMA_REGISTRY[clazz] = schema_class
+    _pending_schemas.append(clazz)
+
+    # Add the marshmallow fields corresponding to the dataclass fields
+    declared_fields = schema_class._declared_fields
+    for field in fields:
+        if field.init:
+            declared_fields[field.name] = field_for_schema(
+                field.type, _get_field_default(field), field.metadata
+            )
     return cast(Type[marshmallow.Schema], schema_class)
 
 
+def _public_members(clazz: type) -> Dict[str, Any]:
+    """
+    Return the public attributes defined on a class or its bases,
+    as obtained by attribute lookup on the class.
+
+    >>> class A:
+    ...     x = 1
+    ...     _private = 2
+    >>> class B(A):
+    ...     y = 3
+    ...     @classmethod
+    ...     def make(cls):
+    ...         return cls
+    >>> members = _public_members(B)
+    >>> sorted(members)
+    ['make', 'x', 'y']
+    >>> members['make']() # Descriptors are bound to the class, as with inspect.getmembers
+    <class 'marshmallow_attrs.B'>
+    """
+    names = dict.fromkeys(
+        k for base in reversed(clazz.__mro__) for k in vars(base) if not k.startswith("_")
+    )
+    return {k: getattr(clazz, k) for k in names}
+
+
 _native_to_marshmallow: Dict[type, Type[marshmallow.fields.Field]] = {
     int: marshmallow.fields.Integer,
     float: marshmallow.fields.Float,
@@ -277,12 +399,69 @@ _native_to_marshmallow: Dict[type, Type[marshmallow.fields.Field]] = {
     datetime.date: marshmallow.fields.Date,
     decimal.Decimal: marshmallow.fields.Decimal,
     uuid.UUID: marshmallow.fields.UUID,
-    Any: marshmallow.fields.Raw,
+}
+
+
+def _native_field(typ: type) -> Optional[Type[marshmallow.fields.Field]]:
+    """
+    Return the marshmallow field class for a native python type, or None.
+    typing.Any is not a class, so it is checked apart from the other types.
+    """
+    if typ is Any:
+        return marshmallow.fields.Raw
+    return _native_to_marshmallow.get(typ)
+
+
+@functools.lru_cache(maxsize=1024)
+def _origin_of(typ: type) -> Any:
+    return _get_origin(typ)
+
+
+# Not cached: unions compare equal regardless of the order of their members
+# (Union[int, str] == Union[str, int]), so a cache would mix up their arguments
+def _args_of(typ: type) -> Tuple[Any, ...]:
+    return _get_args(typ)
+
+
+@functools.lru_cache(maxsize=1024)
+def _is_optional(typ: type) -> bool:
+    return typing_inspect.is_optional_type(typ)
+
+
+def _build_list(typ: type, metadata: Dict[str, Any]) -> marshmallow.fields.Field:
+    list_elements_type = _args_of(typ)[0]
+    return marshmallow.fields.List(field_for_schema(list_elements_type), **metadata)
+
+
+def _build_dict(typ: type, metadata: Dict[str, Any]) -> marshmallow.fields.Field:
+    key_type, value_type = _args_of(typ)
+    return marshmallow.fields.Dict(
+        keys=field_for_schema(key_type),
+        values=field_for_schema(value_type),
+        **metadata,
+    )
+
+
+def _build_callable(typ: type, metadata: Dict[str, Any]) -> marshmallow.fields.Field:
+    return marshmallow.fields.Function(**metadata)
+
+
+# Generic origins (as returned by _origin_of) and the builders
+# producing the corresponding marshmallow field
+_origin_builders: Dict[
+    Any, Callable[[type, Dict[str, Any]], marshmallow.fields.Field]
+] = {
+    list: _build_list,
+    List: _build_list,
+    dict: _build_dict,
+    Dict: _build_dict,
+    collections.abc.Callable: _build_callable,
+    Callable: _build_callable,
 }
 
 
 def field_for_schema(
-    typ: type, default=marshmallow.missing, metadata: Mapping[str, Any] = None
+    typ: type, default: Any = marshmallow.missing, metadata: Mapping[str, Any] = None
 ) -> marshmallow.fields.Field:
     """
     Get a marshmallow Field corresponding to the given python type.
@@ -323,75 +502,102 @@ def field_for_schema(
 
     >>> field_for_schema(Any).__class__
     <class 'marshmallow.fields.Raw'>
+
+    >>> field_for_schema(Union[int, str, None]).__class__
+    <class 'marshmallow.fields.Integer'>
+    >>> field_for_schema(Union[str, int, None]).__class__
+    <class 'marshmallow.fields.String'>
+
+    >>> field_for_schema(Union[None, int]).__class__
+    <class 'marshmallow.fields.Integer'>
+    >>> field_for_schema(Union[None, str, int]).__class__ # The first type besides None is used
+    <class 'marshmallow.fields.String'>
     """
 
-    metadata = {} if metadata is None else dict(metadata)
-    if default is not marshmallow.missing:
-        metadata.setdefault("default", default)
-        # metadata.setdefault("missing", default)
-        metadata.setdefault("required", False)
+    # Values given in the metadata take precedence over the computed defaults
+    if default is marshmallow.missing:
+        if not metadata:
+            # Most common case: a required field of a native type
+            native_field = _native_field(typ)
+            if native_field is not None:
+                return native_field(required=True)
+            return _field_for_schema(typ, {"required": True})
+        field_args = {"required": True, **metadata}
+    elif not metadata:
+        native_field = _native_field(typ)
+        if native_field is not None:
+            return native_field(default=default, required=False)
+        field_args = {"default": default, "required": False}
     else:
-        metadata.setdefault("required", True)
+        field_args = {"default": default, "required": False, **metadata}
+    return _field_for_schema(typ, field_args)
 
+
+def _field_for_schema(typ: type, metadata: Dict[str, Any]) -> marshmallow.fields.Field:
+    """
+    Implementation of :func:`field_for_schema`.
+    `metadata` is a private copy of the field arguments, with the default
+    and required arguments already filled in, and may be modified in place.
+    """
     # If the field was already defined by the user
     predefined_field = metadata.get("marshmallow_field")
     if predefined_field:
         return predefined_field
 
     # Base types
-    if typ in _native_to_marshmallow:
-        return _native_to_marshmallow[typ](**metadata)
+    native_field = _native_field(typ)
+    if native_field is not None:
+        return native_field(**metadata)
+
+    # Plain classes cannot be generics, optionals, NewTypes or enumerations:
+    # skip the typing introspection below and nest them directly
+    if type(typ) is type:
+        return marshmallow.fields.Nested(class_schema(typ), **metadata)
 
     # Generic types
-    origin: type = typing_inspect.get_origin(typ)
-
-    if origin in (list, List):
-        list_elements_type = typing_inspect.get_args(typ, True)[0]
-        return marshmallow.fields.List(field_for_schema(list_elements_type), **metadata)
-    elif origin in (dict, Dict):
-        key_type, value_type = typing_inspect.get_args(typ, True)
-        return marshmallow.fields.Dict(
-            keys=field_for_schema(key_type),
-            values=field_for_schema(value_type),
-            **metadata,
-        )
-    elif origin in (collections.abc.Callable, Callable):
-        return marshmallow.fields.Function(**metadata)
-    elif typing_inspect.is_optional_type(typ):
-        subtyp = next(t for t in typing_inspect.get_args(typ) if t is not NoneType)
+    origin: type = _origin_of(typ)
+
+    builder = _origin_builders.get(origin)
+    if builder:
+        return builder(typ, metadata)
+    elif _is_optional(typ):
+        args = _args_of(typ)
+        if len(args) == 2:  # Optional[T]: a single type besides None
+            subtyp = args[1] if args[0] is NoneType else args[0]
+        else:
+            subtyp = next(t for t in args if t is not NoneType)
         # Treat optional types as types with a None default
         metadata["default"] = metadata.get("default", None)
         metadata["missing"] = metadata.get("missing", None)
         metadata["required"] = False
-        return field_for_schema(subtyp, metadata=metadata)
+        return _field_for_schema(subtyp, metadata)
     # typing.NewType returns a function with a __supertype__ attribute
-    newtype_supertype = getattr(typ, "__supertype__", None)
-    if newtype_supertype and inspect.isfunction(typ):
+    if type(typ) is _NewTypeType and hasattr(typ, "__supertype__"):
         metadata.setdefault("description", typ.__name__)
-        return field_for_schema(newtype_supertype, metadata=metadata, default=default)
+        return _field_for_schema(typ.__supertype__, metadata)
 
     # enumerations
     if type(typ) is EnumMeta:
-        import marshmallow_enum
+        global _enum_field
+        if _enum_field is None:
+            import marshmallow_enum
 
-        return marshmallow_enum.EnumField(typ, **metadata)
+            _enum_field = marshmallow_enum.EnumField
+        return _enum_field(typ, **metadata)
 
     # Nested attr
-    forward_reference = getattr(typ, "__forward_arg__", None)
-    nested = forward_reference or class_schema(typ)
+    if type(typ) is ForwardRef:
+        nested = typ.__forward_arg__
+    else:
+        nested = class_schema(typ)
     return marshmallow.fields.Nested(nested, **metadata)
 
 
-def _base_schema(clazz: type) -> Type[marshmallow.Schema]:
-    class BaseSchema(marshmallow.Schema):
-        @marshmallow.post_load
-        def make_data_class(self, data, **kwargs):
-            return clazz(**data)
-
-    return BaseSchema
+class _AttrsBaseSchema(marshmallow.Schema):
+    """Base class of the schemas generated by :func:`class_schema`"""
 
 
-def _get_field_default(field: attr.ib):
+def _get_field_default(field: attr.Attribute) -> Any:
     """
     Return a marshmallow default value given a dataclass default value
 
@@ -401,8 +607,9 @@ def _get_field_default(field: attr.ib):
     >>> _get_field_default(attr.fields(A).x)
     <marshmallow.missing>
     """
-    if isinstance(field.default, attr.Factory):
-        return field.default.factory
-    elif field.default is attr.NOTHING:
+    default = field.default
+    if default is attr.NOTHING:
         return marshmallow.missing
-    return field.default
+    elif type(default) is attr.Factory:
+        return default.factory
+    return default